@@ -0,0 +1,54 @@
+"""
+Cache File Helpers
+==================
+Locked, atomic writes for the columnar caches built from the CSV files.
+"""
+
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows has no fcntl; msvcrt provides the byte-range lock instead
+    fcntl = None
+    import msvcrt
+
+@contextmanager
+def cache_lock(path):
+    """Hold an exclusive lock on path's .lock file, so one process at a time rebuilds the cache"""
+    lock_path = Path(f'{path}.lock')
+    with open(lock_path, 'a+b') as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        else:
+            lock_file.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:  # LK_LOCK gives up after about 10 seconds; keep waiting
+                    continue
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+@contextmanager
+def atomic_path(path):
+    """Yield a temporary file next to path that replaces path only once the block succeeds"""
+    path = Path(path)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f'{path.name}.', suffix='.tmp')
+    os.close(fd)
+    tmp_path = Path(tmp_name)
+    try:
+        yield tmp_path
+        # Readers see either the old file or the complete new one, never a partial write
+        os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
@@ -5,13 +5,18 @@ An interactive dashboard for visualizing crops and livestock production data acr
 """
 
 import dash
-from dash import dcc, html, Input, Output, callback
+from dash import dcc, html, dash_table, Input, Output, State, Patch, callback, ctx
 import dash_bootstrap_components as dbc
 import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import os
+import tempfile
 from pathlib import Path
+from flask_caching import Cache
+from cache_io import atomic_path, cache_lock
 
 # Initialize the Dash app with a dark theme
 app = dash.Dash(
@@ -20,6 +25,7 @@ app = dash.Dash(
     suppress_callback_exceptions=True,
     title="Asia Agriculture Dashboard"
 )
+server = app.server  # WSGI entry point, e.g. gunicorn dashboard:server
 
 # Custom CSS for dark theme dropdowns
 app.index_string = '''
@@ -115,22 +121,80 @@ app.index_string = '''
 
 # Load data
 DATA_DIR = Path(__file__).parent
+NORMALIZED_DIR = DATA_DIR / 'Production_Crops_Livestock_E_All_Data_(Normalized)'
+MAIN_CSV = NORMALIZED_DIR / 'Production_Crops_Livestock_E_All_Data_(Normalized).csv'
+MAIN_ARROW = MAIN_CSV.with_suffix('.arrow')
+
+# Columns used by the dashboard and the dtypes they are stored with
+MAIN_DTYPES = {
+    'Area': 'category',
+    'Item': 'category',
+    'Element': 'category',
+    'Year': 'int16',
+    'Value': 'float64',  # downcast by downcast_values() before caching
+    'Unit': 'category',
+    'Flag': 'category',
+}
+
+def downcast_values(values):
+    """Narrow Value to int32 when every entry is a whole number that fits, otherwise float32"""
+    if (values.notna().all() and (values % 1 == 0).all()
+            and values.abs().max() <= np.iinfo(np.int32).max):
+        return values.astype('int32')
+    return values.astype('float32')
+
+def build_arrow_cache():
+    """Convert the main CSV to an Arrow IPC file once so later startups can memory-map it"""
+    df = pd.read_csv(MAIN_CSV, encoding='latin1', usecols=list(MAIN_DTYPES), dtype=MAIN_DTYPES,
+                     engine='pyarrow')
+    df['Value'] = downcast_values(df['Value'])
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    # Left uncompressed so the file can be mapped straight into memory
+    with atomic_path(MAIN_ARROW) as tmp_path:
+        with pa.OSFile(str(tmp_path), 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+
+def cache_is_stale(cache_path, source_path):
+    """Check whether a cache file is missing or older than the CSV it was built from"""
+    if not cache_path.exists():
+        return True
+    return source_path.exists() and cache_path.stat().st_mtime < source_path.stat().st_mtime
+
+def read_lookup_csv(csv_path):
+    """Read a lookup CSV through a Feather sidecar that is rebuilt whenever the CSV changes"""
+    feather_path = csv_path.with_suffix('.feather')
+    if not cache_is_stale(feather_path, csv_path):
+        return pd.read_feather(feather_path)
+    with cache_lock(feather_path):
+        # Another worker may have rebuilt it while this one waited for the lock
+        if not cache_is_stale(feather_path, csv_path):
+            return pd.read_feather(feather_path)
+        table = pd.read_csv(csv_path, engine='pyarrow')
+        table.columns = table.columns.str.strip()
+        with atomic_path(feather_path) as tmp_path:
+            table.to_feather(tmp_path)
+    return table
 
 def load_data():
     """Load and prepare the dataset"""
-    # Load main data from normalized folder
-    df = pd.read_csv(DATA_DIR / 'Production_Crops_Livestock_E_All_Data_(Normalized)' / 'Production_Crops_Livestock_E_All_Data_(Normalized).csv', 
-                     encoding='latin1', low_memory=False)
+    # Load main data from the Arrow cache, building it from the CSV on first run.
+    # The file is memory-mapped read-only, so worker processes share its pages
+    # through the OS page cache and numeric columns without nulls are not copied.
+    if cache_is_stale(MAIN_ARROW, MAIN_CSV):
+        with cache_lock(MAIN_ARROW):
+            # Another worker may have rebuilt it while this one waited for the lock
+            if cache_is_stale(MAIN_ARROW, MAIN_CSV):
+                print("Building Arrow cache from CSV (one-time)...")
+                build_arrow_cache()
+    source = pa.memory_map(str(MAIN_ARROW), 'r')
+    table = pa.ipc.open_file(source).read_all()
+    df = table.to_pandas(split_blocks=True)
     
     # Load lookup tables from normalized folder
-    areas = pd.read_csv(DATA_DIR / 'Production_Crops_Livestock_E_All_Data_(Normalized)' / 'Production_Crops_Livestock_E_AreaCodes.csv')
-    items = pd.read_csv(DATA_DIR / 'Production_Crops_Livestock_E_All_Data_(Normalized)' / 'Production_Crops_Livestock_E_ItemCodes.csv')
-    elements = pd.read_csv(DATA_DIR / 'Production_Crops_Livestock_E_All_Data_(Normalized)' / 'Production_Crops_Livestock_E_Elements.csv')
-    
-    # Clean column names
-    areas.columns = areas.columns.str.strip()
-    items.columns = items.columns.str.strip()
-    elements.columns = elements.columns.str.strip()
+    areas = read_lookup_csv(NORMALIZED_DIR / 'Production_Crops_Livestock_E_AreaCodes.csv')
+    items = read_lookup_csv(NORMALIZED_DIR / 'Production_Crops_Livestock_E_ItemCodes.csv')
+    elements = read_lookup_csv(NORMALIZED_DIR / 'Production_Crops_Livestock_E_Elements.csv')
     
     return df, areas, items, elements
 
@@ -138,8 +202,152 @@ def load_data():
 print("Loading data...")
 df_main, df_areas, df_items, df_elements = load_data()
 
+def category_mask(column, value):
+    """Rows of df_main whose categorical column equals value, compared on the integer codes"""
+    values = df_main[column].array
+    code = values.categories.get_indexer([value])[0]
+    if code < 0:
+        return np.zeros(len(values), dtype=bool)
+    return values.codes == code
+
+# Row positions of df_main ordered by (Area, Item, Element, Year), so each country's series
+# are one contiguous run in year order. Positions rather than a sorted copy of the frame keep
+# the memory-mapped data shared between workers; AREA_BOUNDS[code] is where a country's run starts
+AREA_CODES = df_main['Area'].array.codes
+SERIES_ORDER = np.lexsort((df_main['Year'].to_numpy(), df_main['Element'].array.codes,
+                           df_main['Item'].array.codes, AREA_CODES)).astype(np.int32)
+AREA_BOUNDS = np.searchsorted(AREA_CODES[SERIES_ORDER],
+                              np.arange(len(df_main['Area'].cat.categories) + 1))
+
+# Production values with one row per (Item, Area) and one column per year, shared by
+# the comparison, top-producer and geographic callbacks. An item's production can be
+# reported in two units (eggs in t and in 1000 No); like the original per-callback
+# filters, the first row in file order is used
+PRODUCTION_BY_YEAR = (df_main.loc[category_mask('Element', 'Production'), ['Item', 'Area', 'Year', 'Value']]
+                      .drop_duplicates(['Item', 'Area', 'Year'])
+                      .set_index(['Item', 'Area', 'Year'])['Value']
+                      .unstack('Year')
+                      .sort_index())
+
+# Plain numpy views of the table so a lookup is one array gather: each item's rows
+# are contiguous because the index is sorted, and each year maps to a column number
+PRODUCTION_VALUES = PRODUCTION_BY_YEAR.to_numpy()
+PRODUCTION_AREAS = PRODUCTION_BY_YEAR.index.get_level_values('Area')
+ITEM_ROWS = {item: slice(*PRODUCTION_BY_YEAR.index.slice_locs(item, item))
+             for item in PRODUCTION_BY_YEAR.index.unique(level='Item')}
+YEAR_INDEX = {year: i for i, year in enumerate(PRODUCTION_BY_YEAR.columns)}
+
+def production_values(item, year):
+    """Production of an item in a year indexed by Area, for areas that report a value"""
+    rows = ITEM_ROWS.get(item, slice(0, 0))
+    column = YEAR_INDEX.get(year)
+    if column is None:
+        rows = slice(0, 0)
+        column = 0
+    values = pd.Series(PRODUCTION_VALUES[rows, column], index=PRODUCTION_AREAS[rows])
+    return values.dropna()
+
 # Get years from the Year column in normalized format
-years = sorted(df_main['Year'].unique())
+YEAR_LIST = sorted(df_main['Year'].unique().tolist())
+YEAR_MIN, YEAR_MAX = YEAR_LIST[0], YEAR_LIST[-1]
+
+# Dropdown values and options, built once from the categorical columns
+COUNTRIES = sorted(df_main['Area'].cat.categories.tolist())
+ITEMS = sorted(df_main['Item'].cat.categories.tolist())
+ELEMENTS = sorted(df_main['Element'].cat.categories.tolist())
+COUNTRY_OPTIONS = [{'label': c, 'value': c} for c in COUNTRIES]
+ELEMENT_OPTIONS = [{'label': e, 'value': e} for e in ELEMENTS]
+
+# The product list is long, so product dropdowns start with one page of options
+# and fetch matches from the server as the user types
+ITEM_SEARCH_LIMIT = 50
+ITEM_SEARCH_KEYS = [i.lower() for i in ITEMS]
+
+def item_options(search_value=None, selected=None):
+    """Product options containing the typed text, capped at ITEM_SEARCH_LIMIT and keeping the selection"""
+    if search_value:
+        needle = search_value.lower()
+        matches = [i for i, key in zip(ITEMS, ITEM_SEARCH_KEYS) if needle in key][:ITEM_SEARCH_LIMIT]
+    else:
+        matches = ITEMS[:ITEM_SEARCH_LIMIT]
+    if selected and selected not in matches:
+        matches = [selected] + matches
+    return [{'label': i, 'value': i} for i in matches]
+
+ITEM_OPTIONS = item_options()
+
+for dropdown_id in ['trend-item', 'compare-item', 'top-item', 'geo-item', 'explorer-item']:
+    callback(
+        Output(dropdown_id, 'options'),
+        Input(dropdown_id, 'search_value'),
+        State(dropdown_id, 'value')
+    )(item_options)
+
+# Decade marks shared by the year sliders
+YEAR_MARKS = {year: str(year) for year in range(YEAR_MIN, YEAR_MAX + 1, 10)}
+
+# Memoize callback results across sessions. Set CACHE_TYPE=RedisCache and
+# CACHE_REDIS_URL in production. Entries are namespaced by the data and code
+# versions so a refreshed dataset or deploy never serves stale results.
+CACHE_VERSION = f"{int(MAIN_ARROW.stat().st_mtime)}_{int(Path(__file__).stat().st_mtime)}"
+CACHE_CONFIG = {
+    'CACHE_TYPE': os.environ.get('CACHE_TYPE', 'FileSystemCache'),
+    'CACHE_DIR': str(Path(tempfile.gettempdir()) / 'fds_cache' / CACHE_VERSION),
+    'CACHE_KEY_PREFIX': f'fds_{CACHE_VERSION}_',
+    'CACHE_DEFAULT_TIMEOUT': 3600,
+}
+if 'CACHE_REDIS_URL' in os.environ:
+    CACHE_CONFIG['CACHE_REDIS_URL'] = os.environ['CACHE_REDIS_URL']
+cache = Cache(app.server, config=CACHE_CONFIG)
+
+# Longest series drawn point-for-point on the trend chart; longer ones are downsampled
+TREND_MAX_POINTS = 500
+
+def downsample_lttb(x, y, n_out):
+    """Downsample a sorted series to n_out points with Largest-Triangle-Three-Buckets"""
+    x = np.asarray(x)
+    y = np.asarray(y)
+    n = len(x)
+    if n <= n_out or n_out < 3:
+        return x, y
+    
+    xf = x.astype(float)
+    yf = np.nan_to_num(y.astype(float))
+    # First and last points are always kept; the rest are split into n_out - 2 buckets
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    selected = [0]
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            avg_x = xf[end:edges[i + 2]].mean()
+            avg_y = yf[end:edges[i + 2]].mean()
+        else:
+            avg_x, avg_y = xf[-1], yf[-1]
+        # Keep the point forming the largest triangle with the previous pick and the next bucket's mean
+        area = np.abs((xf[a] - avg_x) * (yf[start:end] - yf[a]) -
+                      (xf[a] - xf[start:end]) * (avg_y - yf[a]))
+        a = start + int(np.argmax(area))
+        selected.append(a)
+    selected.append(n - 1)
+    
+    return x[selected], y[selected]
+
+def empty_figure(message):
+    """Build a serialized placeholder figure that shows a centered message"""
+    fig = go.Figure()
+    fig.add_annotation(
+        text=message,
+        xref="paper", yref="paper",
+        x=0.5, y=0.5, showarrow=False,
+        font=dict(size=16, color="#95a5a6")
+    )
+    fig.update_layout(
+        template='plotly_dark',
+        paper_bgcolor='#222222',
+        plot_bgcolor='#222222'
+    )
+    return fig.to_plotly_json()
 
 # App Layout
 app.layout = dbc.Container([
@@ -171,63 +379,63 @@ app.layout = dbc.Container([
 @callback(Output("tab-content", "children"), Input("tabs", "active_tab"))
 def render_tab_content(active_tab):
     """Render content based on selected tab"""
-    if active_tab == "overview":
-        return render_overview()
-    elif active_tab == "trends":
-        return render_trends()
-    elif active_tab == "comparison":
-        return render_comparison()
-    elif active_tab == "top_producers":
-        return render_top_producers()
-    elif active_tab == "geographic":
-        return render_geographic()
-    elif active_tab == "explorer":
-        return render_explorer()
-    return html.Div("Select a tab")
+    return TAB_LAYOUTS.get(active_tab, html.Div("Select a tab"))
 
-def render_overview():
-    """Overview dashboard with key metrics"""
+def build_overview_cache():
+    """Compute the Overview metrics and figures once, since the data never changes"""
     # Calculate key metrics
     total_countries = df_main['Area'].nunique()
     total_items = df_main['Item'].nunique()
-    year_range = f"{min(years)} - {max(years)}"
+    year_range = f"{YEAR_MIN} - {YEAR_MAX}"
     
-    # Get production data for latest year from normalized format
-    latest_year = max(years)
-    production_data = df_main[
-        (df_main['Element'] == 'Production') & 
-        (df_main['Year'] == latest_year)
-    ].copy()
+    # Latest-year production, taken once from the pivot and shared by both rankings
+    production_data = PRODUCTION_BY_YEAR[YEAR_MAX].dropna()
     
     # Top 5 countries by total production
-    country_totals = production_data.groupby('Area')['Value'].sum().sort_values(ascending=False).head(5)
-    top_countries = list(country_totals.items())
+    country_totals = production_data.groupby(level='Area', observed=True).sum().nlargest(5)
     
     # Top 5 items by production
-    item_totals = production_data.groupby('Item')['Value'].sum().sort_values(ascending=False).head(5)
-    top_items = list(item_totals.items())
+    item_totals = production_data.groupby(level='Item', observed=True).sum().nlargest(5)
     
     # Create visualizations
-    # 1. Top items bar chart
+    # 1. Top countries bar chart
+    fig_countries = go.Figure(data=[
+        go.Bar(
+            x=country_totals.index.astype(str),
+            y=country_totals.values,
+            marker_color='#1f77b4',
+            texttemplate='%{y:,.0f}',
+            textposition='outside'
+        )
+    ])
+    fig_countries.update_layout(
+        title=f'Top 5 Countries by Production ({YEAR_MAX})',
+        xaxis_title='Country',
+        yaxis_title='Total Production',
+        height=400,
+        template='plotly_dark'
+    )
+    
+    # 2. Top items bar chart
     fig_items = go.Figure(data=[
         go.Bar(
-            x=[i[0][:30] for i in top_items],  # Truncate long names
-            y=[i[1] for i in top_items],
+            x=item_totals.index.astype(str).str[:30],  # Truncate long names
+            y=item_totals.values,
             marker_color='#2ca02c',
-            text=[f'{i[1]:,.0f}' for i in top_items],
+            texttemplate='%{y:,.0f}',
             textposition='outside'
         )
     ])
     fig_items.update_layout(
-        title=f'Top 5 Products by Production ({max(years)})',
+        title=f'Top 5 Products by Production ({YEAR_MAX})',
         xaxis_title='Product',
         yaxis_title='Total Production',
         height=400,
         template='plotly_dark'
     )
     
-    # 2. Production elements distribution
-    element_counts = df_main.groupby('Element').size()
+    # 3. Production elements distribution
+    element_counts = df_main['Element'].value_counts()
     fig_elements = go.Figure(data=[
         go.Pie(
             labels=element_counts.index,
@@ -241,6 +449,28 @@ def render_overview():
         template='plotly_dark'
     )
     
+    return {
+        'total_countries': total_countries,
+        'total_items': total_items,
+        'year_range': year_range,
+        'total_records': len(df_main),
+        'fig_countries': fig_countries.to_dict(),
+        'fig_items': fig_items.to_dict(),
+        'fig_elements': fig_elements.to_dict(),
+    }
+
+OVERVIEW_CACHE = build_overview_cache()
+
+def render_overview():
+    """Overview dashboard with key metrics"""
+    total_countries = OVERVIEW_CACHE['total_countries']
+    total_items = OVERVIEW_CACHE['total_items']
+    year_range = OVERVIEW_CACHE['year_range']
+    total_records = OVERVIEW_CACHE['total_records']
+    fig_countries = OVERVIEW_CACHE['fig_countries']
+    fig_items = OVERVIEW_CACHE['fig_items']
+    fig_elements = OVERVIEW_CACHE['fig_elements']
+    
     return dbc.Container([
         dbc.Row([
             dbc.Col([
@@ -270,7 +500,7 @@ def render_overview():
             dbc.Col([
                 dbc.Card([
                     dbc.CardBody([
-                        html.H3(len(df_main), className="text-danger"),
+                        html.H3(total_records, className="text-danger"),
                         html.P("Total Records", className="text-muted mb-0")
                     ])
                 ], className="text-center shadow-sm bg-dark")
@@ -278,13 +508,20 @@ def render_overview():
         ], className="mb-4"),
         
         dbc.Row([
+            dbc.Col([
+                dbc.Card([
+                    dbc.CardBody([
+                        dcc.Graph(figure=fig_countries)
+                    ])
+                ], className="shadow-sm bg-dark")
+            ], width=6),
             dbc.Col([
                 dbc.Card([
                     dbc.CardBody([
                         dcc.Graph(figure=fig_items)
                     ])
                 ], className="shadow-sm bg-dark")
-            ], width=12),
+            ], width=6),
         ], className="mb-4"),
         
         dbc.Row([
@@ -300,10 +537,6 @@ def render_overview():
 
 def render_trends():
     """Production trends over time"""
-    countries = sorted(df_main['Area'].unique())
-    items = sorted(df_main['Item'].unique())
-    elements = sorted(df_main['Element'].unique())
-    
     return dbc.Container([
         dbc.Row([
             dbc.Col([
@@ -313,21 +546,21 @@ def render_trends():
                         html.Label("Country:"),
                         dcc.Dropdown(
                             id='trend-country',
-                            options=[{'label': c, 'value': c} for c in countries],
-                            value=countries[0],
+                            options=COUNTRY_OPTIONS,
+                            value=COUNTRIES[0],
                             className="mb-3"
                         ),
                         html.Label("Product:"),
                         dcc.Dropdown(
                             id='trend-item',
-                            options=[{'label': i, 'value': i} for i in items],
-                            value=items[0],
+                            options=ITEM_OPTIONS,
+                            value=ITEMS[0],
                             className="mb-3"
                         ),
                         html.Label("Metric:"),
                         dcc.Dropdown(
                             id='trend-element',
-                            options=[{'label': e, 'value': e} for e in elements],
+                            options=ELEMENT_OPTIONS,
                             value='Production',
                             className="mb-3"
                         ),
@@ -337,74 +570,87 @@ def render_trends():
             dbc.Col([
                 dbc.Card([
                     dbc.CardBody([
-                        dcc.Graph(id='trend-chart', style={'height': '600px'})
+                        dcc.Graph(id='trend-chart', style={'height': '600px'}),
+                        dcc.Store(id='trend-data'),
+                        dcc.Store(id='trend-base', data=TREND_BASE)
                     ])
                 ], className="shadow-sm bg-dark")
             ], width=9),
         ])
     ], fluid=True)
 
-@callback(
-    Output('trend-chart', 'figure'),
-    [Input('trend-country', 'value'),
-     Input('trend-item', 'value'),
-     Input('trend-element', 'value')]
-)
-def update_trend_chart(country, item, element):
-    """Update trend chart based on selections"""
-    filtered_df = df_main[
-        (df_main['Area'] == country) &
-        (df_main['Item'] == item) &
-        (df_main['Element'] == element)
-    ]
-    
-    if filtered_df.empty:
-        fig = go.Figure()
-        fig.add_annotation(
-            text="No data available for this selection",
-            xref="paper", yref="paper",
-            x=0.5, y=0.5, showarrow=False,
-            font=dict(size=16, color="#95a5a6")
-        )
-        fig.update_layout(
-            template='plotly_dark',
-            paper_bgcolor='#222222',
-            plot_bgcolor='#222222'
-        )
-        return fig
-    
-    # Sort by year and get year/value data from normalized format
-    filtered_df = filtered_df.sort_values('Year')
-    year_labels = filtered_df['Year'].tolist()
-    values = filtered_df['Value'].tolist()
-    
-    fig = go.Figure()
-    fig.add_trace(go.Scatter(
-        x=year_labels,
-        y=values,
-        mode='lines+markers',
-        name=element,
-        line=dict(width=3),
-        marker=dict(size=6)
-    ))
-    
-    unit = filtered_df['Unit'].values[0] if 'Unit' in filtered_df.columns else ''
-    
-    fig.update_layout(
-        title=f'{element} of {item} in {country} Over Time',
+# Figure pieces the clientside trend callback fills in, built once with the server-side theme
+TREND_BASE = {
+    'layout': go.Figure().update_layout(
         xaxis_title='Year',
-        yaxis_title=f'{element} ({unit})',
         hovermode='x unified',
         template='plotly_dark'
-    )
+    ).to_plotly_json()['layout'],
+    'empty': empty_figure("No data available for this selection"),
+}
+
+@callback(
+    Output('trend-data', 'data'),
+    Input('trend-country', 'value')
+)
+@cache.memoize()
+def update_trend_data(country):
+    """Collect every (Item, Element) series of a country for the clientside trend chart"""
+    code = df_main['Area'].cat.categories.get_indexer([country])[0]
+    if code < 0:
+        return {}
+    rows = df_main.iloc[SERIES_ORDER[AREA_BOUNDS[code]:AREA_BOUNDS[code + 1]]]
     
-    return fig
+    # Rows are already in year order because SERIES_ORDER is sorted
+    data = {}
+    for (item, element), group in rows.groupby(['Item', 'Element'], observed=True, sort=False):
+        year_labels = group['Year'].to_numpy()
+        values = group['Value'].to_numpy()
+        if len(year_labels) > TREND_MAX_POINTS:
+            year_labels, values = downsample_lttb(year_labels, values, TREND_MAX_POINTS)
+        data.setdefault(item, {})[element] = {
+            'x': year_labels,
+            'y': values,
+            'unit': str(group['Unit'].iat[0]),
+        }
+    return data
+
+# Redraw the trend chart in the browser, so item and metric changes skip the server
+app.clientside_callback(
+    """
+    function(data, country, item, element, base) {
+        const series = data && data[item] && data[item][element];
+        if (!series) {
+            return base.empty;
+        }
+        const layout = Object.assign({}, base.layout, {
+            title: {text: `${element} of ${item} in ${country} Over Time`},
+            yaxis: {title: {text: `${element} (${series.unit})`}}
+        });
+        return {
+            data: [{
+                type: 'scattergl',
+                x: series.x,
+                y: series.y,
+                mode: 'lines+markers',
+                name: element,
+                line: {width: 3},
+                marker: {size: 6}
+            }],
+            layout: layout
+        };
+    }
+    """,
+    Output('trend-chart', 'figure'),
+    [Input('trend-data', 'data'),
+     Input('trend-country', 'value'),
+     Input('trend-item', 'value'),
+     Input('trend-element', 'value')],
+    State('trend-base', 'data')
+)
 
 def render_comparison():
     """Compare multiple countries"""
-    countries = sorted(df_main['Area'].unique())
-    items = sorted(df_main['Item'].unique())
-    
     return dbc.Container([
         dbc.Row([
             dbc.Col([
@@ -414,25 +660,25 @@ def render_comparison():
                         html.Label("Product:"),
                         dcc.Dropdown(
                             id='compare-item',
-                            options=[{'label': i, 'value': i} for i in items],
-                            value=items[0],
+                            options=ITEM_OPTIONS,
+                            value=ITEMS[0],
                             className="mb-3"
                         ),
                         html.Label("Countries (select multiple):"),
                         dcc.Dropdown(
                             id='compare-countries',
-                            options=[{'label': c, 'value': c} for c in countries],
-                            value=countries[:5],
+                            options=COUNTRY_OPTIONS,
+                            value=COUNTRIES[:5],
                             multi=True,
                             className="mb-3"
                         ),
                         html.Label("Year:"),
                         dcc.Slider(
                             id='compare-year',
-                            min=min(years),
-                            max=max(years),
-                            value=max(years),
-                            marks={year: str(year) for year in range(min(years), max(years)+1, 10)},
+                            min=YEAR_MIN,
+                            max=YEAR_MAX,
+                            value=YEAR_MAX,
+                            marks=YEAR_MARKS,
                             tooltip={"placement": "bottom", "always_visible": True}
                         ),
                     ])
@@ -451,71 +697,25 @@ def render_comparison():
         ])
     ], fluid=True)
 
-@callback(
-    Output('compare-chart', 'figure'),
-    [Input('compare-item', 'value'),
-     Input('compare-countries', 'value'),
-     Input('compare-year', 'value')]
-)
-def update_comparison_chart(item, countries_list, year):
-    """Update comparison chart"""
+@cache.memoize()
+def comparison_figure(item, countries_list, year):
+    """Build the serialized comparison chart for one selection"""
     if not countries_list:
-        fig = go.Figure()
-        fig.add_annotation(
-            text="Please select at least one country",
-            xref="paper", yref="paper",
-            x=0.5, y=0.5, showarrow=False,
-            font=dict(size=16, color="#95a5a6")
-        )
-        fig.update_layout(
-            template='plotly_dark',
-            paper_bgcolor='#222222',
-            plot_bgcolor='#222222'
-        )
-        return fig
-    
-    # Get production data for selected countries from normalized format
-    filtered_df = df_main[
-        (df_main['Area'].isin(countries_list)) &
-        (df_main['Item'] == item) &
-        (df_main['Element'] == 'Production') &
-        (df_main['Year'] == year)
-    ]
-    
-    comparison_data = []
-    if not filtered_df.empty:
-        for country in countries_list:
-            country_data = filtered_df[filtered_df['Area'] == country]
-            if not country_data.empty:
-                val = country_data['Value'].values[0]
-                if not pd.isna(val):
-                    comparison_data.append({'Country': country, 'Production': val})
-    
-    if not comparison_data:
-        fig = go.Figure()
-        fig.add_annotation(
-            text="No data available for this selection",
-            xref="paper", yref="paper",
-            x=0.5, y=0.5, showarrow=False,
-            font=dict(size=16, color="#95a5a6")
-        )
-        fig.update_layout(
-            template='plotly_dark',
-            paper_bgcolor='#222222',
-            plot_bgcolor='#222222'
-        )
-        return fig
+        return empty_figure("Please select at least one country")
+    
+    # Gather the selected countries' values in one vectorized reindex
+    series = production_values(item, year).reindex(countries_list).dropna().sort_values()
     
-    df_compare = pd.DataFrame(comparison_data)
-    df_compare = df_compare.sort_values('Production', ascending=True)
+    if series.empty:
+        return empty_figure("No data available for this selection")
     
     fig = go.Figure(data=[
         go.Bar(
-            y=df_compare['Country'],
-            x=df_compare['Production'],
+            y=series.index,
+            x=series.values,
             orientation='h',
             marker_color='#ff7f0e',
-            text=df_compare['Production'].apply(lambda x: f'{x:,.0f}'),
+            texttemplate='%{x:,.0f}',
             textposition='outside'
         )
     ])
@@ -524,16 +724,38 @@ def update_comparison_chart(item, countries_list, year):
         title=f'Production of {item} by Country ({year})',
         xaxis_title='Production',
         yaxis_title='Country',
-        height=max(400, len(df_compare) * 40),
+        height=max(400, len(series) * 40),
         template='plotly_dark'
     )
     
-    return fig
+    return fig.to_plotly_json()
+
+@callback(
+    Output('compare-chart', 'figure'),
+    [Input('compare-item', 'value'),
+     Input('compare-countries', 'value'),
+     Input('compare-year', 'value')]
+)
+def update_comparison_chart(item, countries_list, year):
+    """Update comparison chart, patching it in place when only the year moves"""
+    figure = comparison_figure(item, countries_list, year)
+    if ctx.triggered_id != 'compare-year' or not figure['data']:
+        return figure
+    
+    # Send the new bars and layout values but not the template, and clear
+    # anything a placeholder figure for the previous year may have set
+    patch = Patch()
+    patch['data'] = figure['data']
+    for key, value in figure['layout'].items():
+        if key != 'template':
+            patch['layout'][key] = value
+    patch['layout']['annotations'] = []
+    del patch['layout']['paper_bgcolor']
+    del patch['layout']['plot_bgcolor']
+    return patch
 
 def render_top_producers():
     """Show top producers for different categories"""
-    items = sorted(df_main['Item'].unique())
-    
     return dbc.Container([
         dbc.Row([
             dbc.Col([
@@ -543,8 +765,8 @@ def render_top_producers():
                         html.Label("Product:"),
                         dcc.Dropdown(
                             id='top-item',
-                            options=[{'label': i, 'value': i} for i in items],
-                            value=items[0],
+                            options=ITEM_OPTIONS,
+                            value=ITEMS[0],
                             className="mb-3"
                         ),
                         html.Label("Number of Top Producers:"),
@@ -586,58 +808,18 @@ def render_top_producers():
     [Input('top-item', 'value'),
      Input('top-n', 'value')]
 )
+@cache.memoize()
 def update_top_producers(item, n):
     """Update top producers visualization"""
-    latest_year = max(years)
-    
-    filtered_df = df_main[
-        (df_main['Item'] == item) &
-        (df_main['Element'] == 'Production') &
-        (df_main['Year'] == latest_year)
-    ]
-    
-    if filtered_df.empty:
-        fig = go.Figure()
-        fig.add_annotation(
-            text="No data available",
-            xref="paper", yref="paper",
-            x=0.5, y=0.5, showarrow=False,
-            font=dict(size=16, color="#95a5a6")
-        )
-        fig.update_layout(
-            template='plotly_dark',
-            paper_bgcolor='#222222',
-            plot_bgcolor='#222222'
-        )
-        return fig, "No data available"
-    
-    # Get production values for latest year from normalized format
-    country_production = []
-    for _, row in filtered_df.iterrows():
-        val = row['Value']
-        if not pd.isna(val) and val > 0:
-            country_production.append({
-                'Country': row['Area'],
-                'Production': val
-            })
-    
-    if not country_production:
-        fig = go.Figure()
-        fig.add_annotation(
-            text="No data available",
-            xref="paper", yref="paper",
-            x=0.5, y=0.5, showarrow=False,
-            font=dict(size=16, color="#95a5a6")
-        )
-        fig.update_layout(
-            template='plotly_dark',
-            paper_bgcolor='#222222',
-            plot_bgcolor='#222222'
-        )
-        return fig, "No data available"
+    # Positive production values for the latest year
+    values = production_values(item, YEAR_MAX)
+    df_top = (values[values > 0]
+              .nlargest(n)
+              .rename_axis('Country')
+              .reset_index(name='Production'))
     
-    df_top = pd.DataFrame(country_production)
-    df_top = df_top.sort_values('Production', ascending=False).head(n)
+    if df_top.empty:
+        return empty_figure("No data available"), "No data available"
     
     # Create visualization
     fig = go.Figure(data=[
@@ -645,13 +827,13 @@ def update_top_producers(item, n):
             x=df_top['Country'],
             y=df_top['Production'],
             marker_color=px.colors.qualitative.Set3,
-            text=df_top['Production'].apply(lambda x: f'{x:,.0f}'),
+            texttemplate='%{y:,.0f}',
             textposition='outside'
         )
     ])
     
     fig.update_layout(
-        title=f'Top {n} Producers of {item} ({max(years)})',
+        title=f'Top {n} Producers of {item} ({YEAR_MAX})',
         xaxis_title='Country',
         yaxis_title='Production',
         xaxis={'tickangle': -45},
@@ -674,12 +856,10 @@ def update_top_producers(item, n):
         html.P([html.Strong("Top Producer Share:"), html.Br(), f"{top_share:.1f}%"]),
     ])
     
-    return fig, stats
+    return fig.to_plotly_json(), stats
 
 def render_geographic():
     """Geographic distribution analysis"""
-    items = sorted(df_main['Item'].unique())
-    
     return dbc.Container([
         dbc.Row([
             dbc.Col([
@@ -689,17 +869,17 @@ def render_geographic():
                         html.Label("Product:"),
                         dcc.Dropdown(
                             id='geo-item',
-                            options=[{'label': i, 'value': i} for i in items],
-                            value=items[0],
+                            options=ITEM_OPTIONS,
+                            value=ITEMS[0],
                             className="mb-3"
                         ),
                         html.Label("Year:"),
                         dcc.Slider(
                             id='geo-year',
-                            min=min(years),
-                            max=max(years),
-                            value=max(years),
-                            marks={year: str(year) for year in range(min(years), max(years)+1, 10)},
+                            min=YEAR_MIN,
+                            max=YEAR_MAX,
+                            value=YEAR_MAX,
+                            marks=YEAR_MARKS,
                             tooltip={"placement": "bottom", "always_visible": True}
                         ),
                     ])
@@ -723,56 +903,17 @@ def render_geographic():
     [Input('geo-item', 'value'),
      Input('geo-year', 'value')]
 )
+@cache.memoize()
 def update_geographic_chart(item, year):
     """Update geographic chart"""
-    filtered_df = df_main[
-        (df_main['Item'] == item) &
-        (df_main['Element'] == 'Production') &
-        (df_main['Year'] == year)
-    ]
-    
-    if filtered_df.empty:
-        fig = go.Figure()
-        fig.add_annotation(
-            text="No data available",
-            xref="paper", yref="paper",
-            x=0.5, y=0.5, showarrow=False,
-            font=dict(size=16, color="#95a5a6")
-        )
-        fig.update_layout(
-            template='plotly_dark',
-            paper_bgcolor='#222222',
-            plot_bgcolor='#222222'
-        )
-        return fig
-    
-    # Get data from normalized format
-    geo_data = []
-    for _, row in filtered_df.iterrows():
-        val = row['Value']
-        if not pd.isna(val) and val > 0:
-            geo_data.append({
-                'Country': row['Area'],
-                'Production': val
-            })
-    
-    if not geo_data:
-        fig = go.Figure()
-        fig.add_annotation(
-            text="No data available",
-            xref="paper", yref="paper",
-            x=0.5, y=0.5, showarrow=False,
-            font=dict(size=16, color="#95a5a6")
-        )
-        fig.update_layout(
-            template='plotly_dark',
-            paper_bgcolor='#222222',
-            plot_bgcolor='#222222'
-        )
-        return fig
+    # Positive production values for the selected year
+    values = production_values(item, year)
+    df_geo = (values[values > 0]
+              .rename_axis('Country')
+              .reset_index(name='Production'))
     
-    df_geo = pd.DataFrame(geo_data)
-    df_geo = df_geo.sort_values('Production', ascending=False)
+    if df_geo.empty:
+        return empty_figure("No data available")
     
     # Create treemap
     fig = px.treemap(
@@ -787,14 +928,15 @@ def update_geographic_chart(item, year):
     fig.update_traces(textinfo="label+value")
     fig.update_layout(template='plotly_dark')
     
-    return fig
+    return fig.to_plotly_json()
+
+# Columns shown in the Data Explorer table, and the rows sent to the browser per page
+EXPLORER_COLUMNS = [col for col in ['Area', 'Item', 'Element', 'Year', 'Value', 'Unit', 'Flag']
+                    if col in df_main.columns]
+EXPLORER_PAGE_SIZE = 100
 
 def render_explorer():
     """Data explorer with detailed table"""
-    countries = sorted(df_main['Area'].unique())
-    items = sorted(df_main['Item'].unique())
-    elements = sorted(df_main['Element'].unique())
-    
     return dbc.Container([
         dbc.Row([
             dbc.Col([
@@ -806,27 +948,26 @@ def render_explorer():
                                 html.Label("Country:"),
                                 dcc.Dropdown(
                                     id='explorer-country',
-                                    options=[{'label': 'All', 'value': 'all'}] + 
-                                            [{'label': c, 'value': c} for c in countries],
-                                    value='all'
+                                    options=[{'label': 'All', 'value': 'all'}] + COUNTRY_OPTIONS,
+                                    value='all',
+                                    placeholder='All'
                                 ),
                             ], width=4),
                             dbc.Col([
                                 html.Label("Product:"),
                                 dcc.Dropdown(
                                     id='explorer-item',
-                                    options=[{'label': 'All', 'value': 'all'}] + 
-                                            [{'label': i, 'value': i} for i in items],
-                                    value='all'
+                                    options=ITEM_OPTIONS,
+                                    placeholder='All'
                                 ),
                             ], width=4),
                             dbc.Col([
                                 html.Label("Metric:"),
                                 dcc.Dropdown(
                                     id='explorer-element',
-                                    options=[{'label': 'All', 'value': 'all'}] + 
-                                            [{'label': e, 'value': e} for e in elements],
-                                    value='Production'
+                                    options=ELEMENT_OPTIONS,
+                                    value='Production',
+                                    placeholder='All'
                                 ),
                             ], width=4),
                         ])
@@ -839,7 +980,19 @@ def render_explorer():
             dbc.Col([
                 dbc.Card([
                     dbc.CardBody([
-                        html.Div(id='explorer-table')
+                        html.P(id='explorer-summary', className="text-muted mb-2"),
+                        # Paged on the server, so only the visible page reaches the browser
+                        dash_table.DataTable(
+                            id='explorer-table',
+                            columns=[{'name': col, 'id': col} for col in EXPLORER_COLUMNS],
+                            page_action='custom',
+                            page_current=0,
+                            page_size=EXPLORER_PAGE_SIZE,
+                            fixed_rows={'headers': True},
+                            style_table={'height': '600px', 'overflowX': 'auto', 'overflowY': 'auto'},
+                            style_header={'backgroundColor': '#303030', 'color': '#ecf0f1', 'fontWeight': 'bold'},
+                            style_cell={'backgroundColor': '#222222', 'color': '#ecf0f1', 'border': '1px solid #444444'}
+                        )
                     ])
                 ], className="shadow-sm bg-dark")
             ], width=12),
@@ -847,60 +1000,51 @@ def render_explorer():
     ], fluid=True)
 
 @callback(
-    Output('explorer-table', 'children'),
+    [Output('explorer-table', 'data'),
+     Output('explorer-table', 'page_count'),
+     Output('explorer-table', 'page_current'),
+     Output('explorer-summary', 'children')],
     [Input('explorer-country', 'value'),
      Input('explorer-item', 'value'),
-     Input('explorer-element', 'value')]
+     Input('explorer-element', 'value'),
+     Input('explorer-table', 'page_current')]
 )
-def update_explorer_table(country, item, element):
-    """Update data explorer table"""
-    # Handle None values on initial load
-    if country is None:
-        country = 'all'
-    if item is None:
-        item = 'all'
-    if element is None:
-        element = 'all'
-    
-    filtered_df = df_main.copy()
-    
-    if country != 'all':
-        filtered_df = filtered_df[filtered_df['Area'] == country]
-    if item != 'all':
-        filtered_df = filtered_df[filtered_df['Item'] == item]
-    if element != 'all':
-        filtered_df = filtered_df[filtered_df['Element'] == element]
-    
-    # Limit to 100 rows for performance
-    filtered_df = filtered_df.head(100)
-    
-    # Select key columns to display for normalized format
-    display_cols = ['Area', 'Item', 'Element', 'Year', 'Value', 'Unit', 'Flag']
-    # Only select columns that exist
-    display_cols = [col for col in display_cols if col in filtered_df.columns]
-    filtered_df = filtered_df[display_cols]
-    
-    if filtered_df.empty:
-        return html.P("No data available for the selected filters.", className="text-muted")
-    
-    # Create table without dark parameter (use className instead)
-    table = dbc.Table.from_dataframe(
-        filtered_df,
-        striped=True,
-        bordered=True,
-        hover=True,
-        responsive=True,
-        size='sm',
-        className='table-dark'
-    )
+def update_explorer_table(country, item, element, page_current):
+    """Send one page of the records matching the explorer filters"""
+    # A filter change starts again from the first page
+    if ctx.triggered_id != 'explorer-table':
+        page_current = 0
     
-    return html.Div([
-        html.P(f"Showing {len(filtered_df)} records (limited to 100)", className="text-muted mb-2"),
-        table
-    ])
+    mask = np.ones(len(df_main), dtype=bool)
+    if country and country != 'all':
+        mask &= category_mask('Area', country)
+    if item:
+        mask &= category_mask('Item', item)
+    if element:
+        mask &= category_mask('Element', element)
+    positions = np.flatnonzero(mask)
+    if len(positions) == 0:
+        return [], 1, 0, "No data available for the selected filters."
+    
+    page_count = -(-len(positions) // EXPLORER_PAGE_SIZE)
+    page_current = min(page_current or 0, page_count - 1)
+    start = page_current * EXPLORER_PAGE_SIZE
+    page = positions[start:start + EXPLORER_PAGE_SIZE]
+    records = df_main[EXPLORER_COLUMNS].iloc[page].to_dict('records')
+    summary = f"Showing records {start + 1:,}-{start + len(page):,} of {len(positions):,}"
+    return records, page_count, page_current, summary
+
+# Every tab layout is static, so each one is built once and reused on every tab switch
+TAB_LAYOUTS = {
+    "overview": render_overview(),
+    "trends": render_trends(),
+    "comparison": render_comparison(),
+    "top_producers": render_top_producers(),
+    "geographic": render_geographic(),
+    "explorer": render_explorer(),
+}
 
 if __name__ == '__main__':
-    import os
     port = int(os.environ.get("PORT", 8050))  # use Render's dynamic port
     print(f"Starting dashboard server on port {port} ...")
     app.run_server(host='0.0.0.0', port=port, debug=False)
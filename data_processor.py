@@ -4,144 +4,385 @@ Data Processing Utilities for Agriculture Dashboard
 Helper functions for loading, cleaning, and processing agricultural data.
 """
 
+import operator
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from functools import cached_property, reduce, wraps
 from pathlib import Path
 from typing import Dict, List, Tuple
 
+from cache_io import atomic_path, cache_lock
+
+try:
+    import polars as pl
+except ImportError:  # polars is optional; only PolarsDataProcessor needs it
+    pl = None
+
+try:
+    import numexpr as ne
+except ImportError:  # numexpr is optional; filter_data falls back to numpy masks
+    ne = None
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional; the missing-data scan falls back to numpy
+    njit = None
+
+def _count_missing_numpy(values, country_codes, item_codes, year_codes,
+                         n_countries, n_items, n_years):
+    """Count NaN values by country, item and year with numpy; code -1 (null label) is skipped"""
+    missing = np.isnan(values)
+    return (np.bincount(country_codes[missing & (country_codes >= 0)], minlength=n_countries),
+            np.bincount(item_codes[missing & (item_codes >= 0)], minlength=n_items),
+            np.bincount(year_codes[missing], minlength=n_years))
+
+if njit is not None:
+    @njit(cache=True)
+    def _count_missing(values, country_codes, item_codes, year_codes,
+                       n_countries, n_items, n_years):
+        """Count NaN values by country, item and year in a single pass; code -1 (null label) is skipped"""
+        by_country = np.zeros(n_countries, np.int64)
+        by_item = np.zeros(n_items, np.int64)
+        by_year = np.zeros(n_years, np.int64)
+        for i in range(values.shape[0]):
+            if np.isnan(values[i]):
+                if country_codes[i] >= 0:
+                    by_country[country_codes[i]] += 1
+                if item_codes[i] >= 0:
+                    by_item[item_codes[i]] += 1
+                by_year[year_codes[i]] += 1
+        return by_country, by_item, by_year
+else:
+    _count_missing = _count_missing_numpy
+
+def _wide_row_to_series(row: pd.Series, year_cols: List[str],
+                        positive: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+    """Years and values of the non-missing (or, with positive, the > 0) year columns of a wide-format row"""
+    values = row[year_cols].to_numpy(dtype=np.float64, na_value=np.nan)
+    mask = ~np.isnan(values)
+    if positive:
+        mask &= values > 0
+    years = np.array([int(col[1:]) for col in year_cols])
+    return years[mask], values[mask]
+
+def _memoized(method):
+    """Cache a query method's result per processor, keyed by its arguments; callers get a copy"""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        key = (method.__qualname__, args, tuple(sorted(kwargs.items())))
+        try:
+            result = self._query_cache[key]
+        except KeyError:
+            if len(self._query_cache) >= self.QUERY_CACHE_SIZE:
+                self._query_cache.pop(next(iter(self._query_cache)))  # drop the oldest entry
+            result = self._query_cache[key] = method(self, *args, **kwargs)
+        # Results are small, and a copy keeps callers from changing the cached frame
+        return result.copy()
+    return wrapper
+
 class DataProcessor:
     """Process and transform agricultural production data"""
     
+    # Repeated labels stored as categoricals, so filters compare integer codes
+    CATEGORY_COLUMNS = ('Area', 'Item', 'Element', 'Unit')
+    # Narrow numeric types; float32 keeps the ~7 significant digits FAO reports
+    NUMERIC_DTYPES = {'Year': 'int16', 'Value': 'float32'}
+    # The main cache is sorted by these columns and written in small row groups,
+    # so query() filters can skip every row group whose min/max cannot match.
+    # Item leads: it is the most selective filter, and an item's rows for every
+    # element then sit in one contiguous run
+    CACHE_SORT_COLUMNS = ['Item', 'Element', 'Area']
+    PARQUET_ROW_GROUP_SIZE = 100_000
+    # Stored in the Parquet metadata; bump it whenever the sort order or column
+    # encoding changes, so caches written with the old layout are rebuilt
+    CACHE_LAYOUT_KEY = b'fds_cache_layout'
+    CACHE_LAYOUT_VERSION = b'2'
+    QUERY_COLUMNS = ['Area', 'Item', 'Element', 'Year', 'Value', 'Unit']
+    # filter_data_indexed binary-searches rows sorted by these columns; Element leads
+    # because every keyed query in this module names one
+    INDEX_COLUMNS = ('Element', 'Item', 'Area')
+    # Results kept per processor by the _memoized query methods
+    QUERY_CACHE_SIZE = 256
+    
     def __init__(self, data_dir: Path):
         self.data_dir = Path(data_dir)
+        self.cache_dir = self.data_dir / 'cache'
+        self.normalized_dir = self.data_dir / 'Production_Crops_Livestock_E_All_Data_(Normalized)'
+        self.main_csv = self.normalized_dir / 'Production_Crops_Livestock_E_All_Data_(Normalized).csv'
+        self.main_cache = self.cache_dir / 'main.parquet'
         self.df_main = None
-        self.df_areas = None
-        self.df_items = None
-        self.df_elements = None
-        
-    def load_all_data(self) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
-        """Load all CSV files"""
-        print("Loading main dataset from normalized folder...")
-        self.df_main = pd.read_csv(
-            self.data_dir / 'Production_Crops_Livestock_E_All_Data_(Normalized)' / 'Production_Crops_Livestock_E_All_Data_(Normalized).csv',
+        self._row_order = None
+        self._sorted_codes = None
+        self._query_cache = {}
+        
+    def _read_csv_cached(self, csv_path: Path, cache_path: Path, sort_by: List[str] = None,
+                         encoding: str = 'utf8', column_types: Dict[str, pa.DataType] = None) -> pd.DataFrame:
+        """Read a CSV through a columnar cache file that is rebuilt whenever the CSV is newer"""
+        if self._cache_is_current(csv_path, cache_path):
+            return self._read_cache(cache_path)
+        cache_path.parent.mkdir(exist_ok=True)
+        with cache_lock(cache_path):
+            # Another process may have rebuilt the cache while this one waited for the lock
+            if self._cache_is_current(csv_path, cache_path):
+                return self._read_cache(cache_path)
+            return self._build_cache(csv_path, cache_path, sort_by, encoding, column_types)
+    
+    def _cache_is_current(self, csv_path: Path, cache_path: Path) -> bool:
+        """Check that a cache file exists, is not older than its CSV and, for Parquet, has the current layout"""
+        if not cache_path.exists() or (csv_path.exists()
+                                       and cache_path.stat().st_mtime < csv_path.stat().st_mtime):
+            return False
+        if cache_path.suffix == '.parquet':
+            metadata = pq.read_schema(cache_path).metadata or {}
+            return metadata.get(self.CACHE_LAYOUT_KEY) == self.CACHE_LAYOUT_VERSION
+        return True
+    
+    def _read_cache(self, cache_path: Path) -> pd.DataFrame:
+        """Read a Parquet or Feather cache file"""
+        if cache_path.suffix == '.parquet':
+            return pd.read_parquet(cache_path, engine='pyarrow',
+                                   read_dictionary=list(self.CATEGORY_COLUMNS))
+        return pd.read_feather(cache_path)
+    
+    def _build_cache(self, csv_path: Path, cache_path: Path, sort_by: List[str],
+                     encoding: str, column_types: Dict[str, pa.DataType]) -> pd.DataFrame:
+        """Parse a CSV and write it to cache_path, which is replaced only once the write completes"""
+        # Multi-threaded Arrow parse; typed columns skip inference and dictionary
+        # columns arrive as categoricals
+        table = pacsv.read_csv(csv_path,
+                               read_options=pacsv.ReadOptions(encoding=encoding, block_size=64 << 20),
+                               convert_options=pacsv.ConvertOptions(column_types=column_types))
+        df = table.to_pandas()
+        # Clean column names before caching so warm loads skip it
+        df.columns = df.columns.str.strip()
+        # Labels are sorted and stored as plain strings (still dictionary-encoded on disk):
+        # category codes follow first appearance in the CSV, not the string order that
+        # row-group min/max statistics use, and statistics on categorical columns are
+        # not used to skip row groups at all
+        labels = df.select_dtypes('category').columns
+        df = df.astype({col: 'str' for col in labels})
+        if sort_by:
+            df = df.sort_values(sort_by, kind='stable', ignore_index=True)
+        with atomic_path(cache_path) as tmp_path:
+            if cache_path.suffix == '.parquet':
+                table = pa.Table.from_pandas(df, preserve_index=False)
+                table = table.replace_schema_metadata({**table.schema.metadata,
+                                                       self.CACHE_LAYOUT_KEY: self.CACHE_LAYOUT_VERSION})
+                pq.write_table(table, tmp_path, compression='zstd', row_group_size=self.PARQUET_ROW_GROUP_SIZE)
+            else:
+                df.to_feather(tmp_path)
+        return df.astype({col: 'category' for col in labels})
+    
+    def _read_main_cached(self) -> pd.DataFrame:
+        """Read the main dataset through the Parquet cache, building the cache if needed"""
+        return self._read_csv_cached(
+            self.main_csv,
+            self.main_cache,
+            sort_by=self.CACHE_SORT_COLUMNS,
             encoding='latin1',
-            low_memory=False
+            column_types={**{col: pa.dictionary(pa.int32(), pa.string()) for col in self.CATEGORY_COLUMNS},
+                          **{col: pa.from_numpy_dtype(np.dtype(dtype))
+                             for col, dtype in self.NUMERIC_DTYPES.items()}}
         )
-        
-        print("Loading lookup tables...")
-        self.df_areas = pd.read_csv(self.data_dir / 'Production_Crops_Livestock_E_All_Data_(Normalized)' / 'Production_Crops_Livestock_E_AreaCodes.csv')
-        self.df_items = pd.read_csv(self.data_dir / 'Production_Crops_Livestock_E_All_Data_(Normalized)' / 'Production_Crops_Livestock_E_ItemCodes.csv')
-        self.df_elements = pd.read_csv(self.data_dir / 'Production_Crops_Livestock_E_All_Data_(Normalized)' / 'Production_Crops_Livestock_E_Elements.csv')
-        
-        # Clean column names
-        self.df_areas.columns = self.df_areas.columns.str.strip()
-        self.df_items.columns = self.df_items.columns.str.strip()
-        self.df_elements.columns = self.df_elements.columns.str.strip()
-        
-        print(f"Loaded {len(self.df_main)} records from main dataset")
+    
+    def load_all_data(self) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+        """Load the main dataset and the area, item and element lookup tables"""
+        self.load_main_data()
         print(f"Loaded {len(self.df_areas)} areas, {len(self.df_items)} items, {len(self.df_elements)} elements")
-        
         return self.df_main, self.df_areas, self.df_items, self.df_elements
     
-    def get_year_columns(self) -> List[str]:
-        """Extract year columns from main dataset - for normalized format, returns Year column"""
+    def load_main_data(self) -> pd.DataFrame:
+        """Load only the main dataset, using the Parquet cache in data_dir/cache when it is current"""
+        print("Loading main dataset from normalized folder...")
+        self.df_main = self._read_main_cached()
+        # No-op for caches written with these dtypes, converts older ones and wide year columns
+        dtypes = {col: 'category' for col in self.CATEGORY_COLUMNS}
+        for col in self.df_main.columns:
+            if col in self.NUMERIC_DTYPES:
+                dtypes[col] = self.NUMERIC_DTYPES[col]
+            elif col.startswith('Y') and col[1:].isdigit():
+                dtypes[col] = 'float32'
+        self.df_main = self.df_main.astype(dtypes)
+        # Row positions in INDEX_COLUMNS order, plus each column's category codes in that
+        # order, so keyed lookups search a contiguous run without a sorted copy of the frame
+        codes = [self.df_main[col].cat.codes.to_numpy() for col in self.INDEX_COLUMNS]
+        self._row_order = np.lexsort(codes[::-1]).astype(np.int32)
+        self._sorted_codes = {col: col_codes[self._row_order]
+                              for col, col_codes in zip(self.INDEX_COLUMNS, codes)}
+        # Year and category properties and query results are cached per dataset, so drop any from a previous load
+        for name in ('year_columns', 'years', 'category_sets'):
+            self.__dict__.pop(name, None)
+        self._query_cache = {}
+        
+        print(f"Loaded {len(self.df_main)} records from main dataset (lookup tables load on first use)")
+        
+        return self.df_main
+    
+    @cached_property
+    def df_areas(self) -> pd.DataFrame:
+        """Area code lookup table, read on first access"""
+        return self._read_csv_cached(self.normalized_dir / 'Production_Crops_Livestock_E_AreaCodes.csv',
+                                     self.cache_dir / 'areas.feather')
+    
+    @cached_property
+    def df_items(self) -> pd.DataFrame:
+        """Item code lookup table, read on first access"""
+        return self._read_csv_cached(self.normalized_dir / 'Production_Crops_Livestock_E_ItemCodes.csv',
+                                     self.cache_dir / 'items.feather')
+    
+    @cached_property
+    def df_elements(self) -> pd.DataFrame:
+        """Element lookup table, read on first access"""
+        return self._read_csv_cached(self.normalized_dir / 'Production_Crops_Livestock_E_Elements.csv',
+                                     self.cache_dir / 'elements.feather')
+    
+    @cached_property
+    def year_columns(self) -> List[str]:
+        """Year columns of the main dataset - for normalized format, the Year column"""
         if 'Year' in self.df_main.columns:
             return ['Year']  # Normalized format
         return [col for col in self.df_main.columns if col.startswith('Y')]  # Wide format
     
-    def get_years(self) -> List[int]:
-        """Get list of years in dataset"""
+    @cached_property
+    def years(self) -> List[int]:
+        """Sorted list of years in dataset"""
         if 'Year' in self.df_main.columns:
             return sorted(self.df_main['Year'].unique())
-        year_cols = self.get_year_columns()
-        return [int(col[1:]) for col in year_cols]
+        return [int(col[1:]) for col in self.year_columns]
+    
+    @cached_property
+    def category_sets(self) -> Dict[str, frozenset]:
+        """Categories of each categorical label column, as frozensets for O(1) membership tests"""
+        return {col: frozenset(self.df_main[col].cat.categories)
+                for col in self.CATEGORY_COLUMNS
+                if col in self.df_main.columns and isinstance(self.df_main[col].dtype, pd.CategoricalDtype)}
     
     def filter_data(self, country: str = None, item: str = None, 
                    element: str = None) -> pd.DataFrame:
         """Filter data based on criteria"""
-        df = self.df_main.copy()
-        
+        # A value missing from a column's categories cannot match, so skip the scan
+        for col, value in (('Area', country), ('Item', item), ('Element', element)):
+            if value and col in self.category_sets and value not in self.category_sets[col]:
+                return self.df_main.iloc[0:0]
+        
+        terms = [(col, value) for col, value in (('Area', country), ('Item', item), ('Element', element))
+                 if value]
+        if ne is not None and len(terms) > 1 and all(col in self.category_sets for col, _ in terms):
+            # numexpr fuses the code comparisons and ANDs into one pass with a single output mask
+            arrays = {}
+            for i, (col, value) in enumerate(terms):
+                arrays[f'c{i}'] = self.df_main[col].cat.codes.to_numpy()
+                arrays[f'v{i}'] = np.int64(self.df_main[col].cat.categories.get_loc(value))
+            expression = ' & '.join(f'(c{i} == v{i})' for i in range(len(terms)))
+            return self.df_main.loc[ne.evaluate(expression, local_dict=arrays)]
+        
+        # One combined mask and a single selection; callers never modify the result
+        mask = np.ones(len(self.df_main), dtype=bool)
         if country:
-            df = df[df['Area'] == country]
+            mask &= self.df_main['Area'].values == country
         if item:
-            df = df[df['Item'] == item]
+            mask &= self.df_main['Item'].values == item
         if element:
-            df = df[df['Element'] == element]
+            mask &= self.df_main['Element'].values == element
             
-        return df
+        return self.df_main.loc[mask]
+    
+    def filter_data_indexed(self, country: str = None, item: str = None,
+                            element: str = None) -> pd.DataFrame:
+        """Filter data like filter_data, by binary search over the rows sorted by INDEX_COLUMNS"""
+        values = {'Area': country, 'Item': item, 'Element': element}
+        lo, hi = 0, len(self._row_order)
+        prefix = True
+        keep = None
+        for col in self.INDEX_COLUMNS:
+            if not values[col]:
+                prefix = False
+                continue
+            code = self.df_main[col].cat.categories.get_indexer([values[col]])[0]
+            if code < 0:
+                return self.df_main.iloc[0:0]
+            run = self._sorted_codes[col][lo:hi]
+            if prefix:
+                # Columns before this one are fixed, so its codes are sorted within [lo, hi)
+                lo, hi = lo + np.searchsorted(run, code, 'left'), lo + np.searchsorted(run, code, 'right')
+            else:
+                keep = run == code if keep is None else keep & (run == code)
+        positions = self._row_order[lo:hi]
+        if keep is not None:
+            positions = positions[keep]
+        return self.df_main.iloc[positions]
     
+    def query(self, country: str = None, item: str = None, element: str = None,
+              years: List[int] = None) -> pd.DataFrame:
+        """Read only the matching rows of QUERY_COLUMNS from the Parquet cache, without loading it all"""
+        if not self._cache_is_current(self.main_csv, self.main_cache):
+            # Missing, stale or old-layout cache: build it from the CSV first
+            self._read_main_cached()
+        
+        conditions = []
+        if country:
+            conditions.append(ds.field('Area') == country)
+        if item:
+            conditions.append(ds.field('Item') == item)
+        if element:
+            conditions.append(ds.field('Element') == element)
+        if years:
+            conditions.append(ds.field('Year').isin(list(years)))
+        
+        dataset = ds.dataset(self.main_cache, format='parquet')
+        table = dataset.to_table(columns=self.QUERY_COLUMNS,
+                                 filter=reduce(operator.and_, conditions) if conditions else None)
+        return table.to_pandas()
+    
+    @_memoized
     def get_time_series(self, country: str, item: str, element: str) -> pd.DataFrame:
         """Get time series data for specific filters"""
-        filtered = self.filter_data(country, item, element)
+        filtered = self.filter_data_indexed(country, item, element)
         
         if filtered.empty:
             return pd.DataFrame()
         
         # For normalized format, data is already in Year/Value format
         if 'Year' in filtered.columns and 'Value' in filtered.columns:
-            result = filtered[['Year', 'Value', 'Unit']].copy() if 'Unit' in filtered.columns else filtered[['Year', 'Value']].copy()
-            return result.sort_values('Year')
+            columns = ['Year', 'Value', 'Unit'] if 'Unit' in filtered.columns else ['Year', 'Value']
+            return filtered[columns].sort_values('Year')
         
         # For wide format (legacy)
-        year_cols = self.get_year_columns()
         row = filtered.iloc[0]
-        
-        data = []
-        for year_col in year_cols:
-            value = row[year_col]
-            if not pd.isna(value):
-                data.append({
-                    'Year': int(year_col[1:]),
-                    'Value': value,
-                    'Unit': row.get('Unit', '')
-                })
-        
-        return pd.DataFrame(data)
+        years, values = _wide_row_to_series(row, self.year_columns)
+        return pd.DataFrame({'Year': years, 'Value': values, 'Unit': row.get('Unit', '')})
     
+    @_memoized
     def get_top_producers(self, item: str, year: int, n: int = 10) -> pd.DataFrame:
         """Get top N producers for a specific item and year"""
-        filtered = self.filter_data(item=item, element='Production')
+        filtered = self.filter_data_indexed(item=item, element='Production')
         
         if filtered.empty:
             return pd.DataFrame()
         
         # For normalized format
         if 'Year' in filtered.columns and 'Value' in filtered.columns:
-            year_data = filtered[filtered['Year'] == year].copy()
+            # NaN fails the > 0 test, so missing values drop out with the zeros
+            year_data = filtered.loc[(filtered['Year'] == year) & (filtered['Value'] > 0),
+                                     ['Area', 'Value', 'Unit']]
             if year_data.empty:
                 return pd.DataFrame()
             
-            production_data = []
-            for _, row in year_data.iterrows():
-                value = row['Value']
-                if not pd.isna(value) and value > 0:
-                    production_data.append({
-                        'Country': row['Area'],
-                        'Production': value,
-                        'Unit': row.get('Unit', '')
-                    })
-            
-            df = pd.DataFrame(production_data)
-            return df.sort_values('Production', ascending=False).head(n)
+            year_data = year_data.rename(columns={'Area': 'Country', 'Value': 'Production'})
+            return year_data.nlargest(n, 'Production')
         
         # For wide format (legacy)
         year_col = f'Y{year}'
         if year_col not in filtered.columns:
             return pd.DataFrame()
         
-        # Extract production values
-        production_data = []
-        for _, row in filtered.iterrows():
-            value = row[year_col]
-            if not pd.isna(value) and value > 0:
-                production_data.append({
-                    'Country': row['Area'],
-                    'Production': value,
-                    'Unit': row.get('Unit', '')
-                })
-        
-        df = pd.DataFrame(production_data)
-        return df.sort_values('Production', ascending=False).head(n)
+        year_data = filtered.loc[filtered[year_col] > 0, ['Area', year_col, 'Unit']]
+        year_data = year_data.rename(columns={'Area': 'Country', year_col: 'Production'})
+        return year_data.nlargest(n, 'Production')
     
     def calculate_growth_rate(self, country: str, item: str, 
                              start_year: int, end_year: int) -> float:
@@ -168,86 +409,148 @@ class DataProcessor:
         
         return cagr
     
+    def calculate_growth_rates_bulk(self, countries: List[str], item: str,
+                                    start_year: int, end_year: int) -> pd.Series:
+        """Calculate CAGR for several countries at once, indexed by country"""
+        filtered = self.filter_data_indexed(item=item, element='Production')
+        filtered = filtered[filtered['Area'].isin(countries)]
+        
+        # Start and end values side by side, one row per country
+        if 'Year' in filtered.columns and 'Value' in filtered.columns:
+            filtered = filtered[filtered['Year'].isin([start_year, end_year])]
+            values = filtered.pivot_table(index='Area', columns='Year', values='Value',
+                                          aggfunc='first', observed=True)
+        else:
+            year_cols = [f'Y{start_year}', f'Y{end_year}']
+            if not set(year_cols) <= set(filtered.columns):
+                return pd.Series(dtype=float)
+            values = filtered.groupby('Area', observed=True)[year_cols].first()
+            values.columns = [start_year, end_year]
+        values = values.reindex(index=countries, columns=[start_year, end_year])
+        
+        start_val = values[start_year]
+        end_val = values[end_year]
+        n_years = end_year - start_year
+        cagr = ((end_val / start_val) ** (1 / n_years) - 1) * 100
+        
+        return cagr.where((start_val > 0) & (end_val > 0)).dropna()
+    
+    @_memoized
     def get_production_summary(self, year: int) -> pd.DataFrame:
         """Get production summary for all items in a specific year"""
-        year_col = f'Y{year}'
-        
         production_df = self.filter_data(element='Production')
         
-        if production_df.empty or year_col not in production_df.columns:
+        if production_df.empty:
             return pd.DataFrame()
         
-        summary = production_df.groupby(['Item', 'Unit'])[year_col].sum().reset_index()
+        # For normalized format
+        if 'Year' in production_df.columns and 'Value' in production_df.columns:
+            production_df = production_df[production_df['Year'] == year]
+            year_col = 'Value'
+        # For wide format (legacy)
+        else:
+            year_col = f'Y{year}'
+            if year_col not in production_df.columns:
+                return pd.DataFrame()
+        
+        # Only observed (Item, Unit) pairs, unsorted since the result is sorted by total below
+        grouped = production_df.groupby(['Item', 'Unit'], observed=True, sort=False)[year_col]
+        if njit is not None:
+            summary = grouped.sum(engine='numba', engine_kwargs={'parallel': True}).reset_index()
+            # The numba engine always returns float64; keep the column's dtype like the default engine
+            summary[year_col] = summary[year_col].astype(production_df[year_col].dtype)
+        else:
+            summary = grouped.sum().reset_index()
         summary.columns = ['Item', 'Unit', 'Total_Production']
         summary = summary[summary['Total_Production'] > 0]
         summary = summary.sort_values('Total_Production', ascending=False)
         
         return summary
     
+    @_memoized
     def get_country_portfolio(self, country: str, year: int, top_n: int = 20) -> pd.DataFrame:
         """Get top products for a specific country"""
-        year_col = f'Y{year}'
+        country_df = self.filter_data_indexed(country=country, element='Production')
         
-        country_df = self.filter_data(country=country, element='Production')
-        
-        if country_df.empty or year_col not in country_df.columns:
+        if country_df.empty:
             return pd.DataFrame()
         
-        portfolio = []
-        for _, row in country_df.iterrows():
-            value = row[year_col]
-            if not pd.isna(value) and value > 0:
-                portfolio.append({
-                    'Item': row['Item'],
-                    'Production': value,
-                    'Unit': row.get('Unit', '')
-                })
+        # For normalized format
+        if 'Year' in country_df.columns and 'Value' in country_df.columns:
+            portfolio = country_df.loc[(country_df['Year'] == year) & (country_df['Value'] > 0),
+                                       ['Item', 'Value', 'Unit']]
+            portfolio = portfolio.rename(columns={'Value': 'Production'})
+            return portfolio.nlargest(top_n, 'Production')
         
-        df = pd.DataFrame(portfolio)
-        return df.sort_values('Production', ascending=False).head(top_n)
+        # For wide format (legacy)
+        year_col = f'Y{year}'
+        if year_col not in country_df.columns:
+            return pd.DataFrame()
+        
+        portfolio = country_df.loc[country_df[year_col] > 0, ['Item', year_col, 'Unit']]
+        portfolio = portfolio.rename(columns={year_col: 'Production'})
+        return portfolio.nlargest(top_n, 'Production')
     
     def get_regional_comparison(self, item: str, year: int) -> pd.DataFrame:
         """Compare production across all countries for an item"""
-        year_col = f'Y{year}'
-        
         filtered = self.filter_data(item=item, element='Production')
         
-        if filtered.empty or year_col not in filtered.columns:
+        if filtered.empty:
             return pd.DataFrame()
         
-        comparison = []
-        for _, row in filtered.iterrows():
-            value = row[year_col]
-            if not pd.isna(value):
-                comparison.append({
-                    'Country': row['Area'],
-                    'Production': value,
-                    'Unit': row.get('Unit', '')
-                })
+        # For normalized format
+        if 'Year' in filtered.columns and 'Value' in filtered.columns:
+            comparison = filtered.loc[(filtered['Year'] == year) & filtered['Value'].notna(),
+                                      ['Area', 'Value', 'Unit']]
+            comparison = comparison.rename(columns={'Area': 'Country', 'Value': 'Production'})
+            return comparison.sort_values('Production', ascending=False)
+        
+        # For wide format (legacy)
+        year_col = f'Y{year}'
+        if year_col not in filtered.columns:
+            return pd.DataFrame()
         
-        return pd.DataFrame(comparison).sort_values('Production', ascending=False)
+        comparison = filtered.loc[filtered[year_col].notna(), ['Area', year_col, 'Unit']]
+        comparison = comparison.rename(columns={'Area': 'Country', year_col: 'Production'})
+        return comparison.sort_values('Production', ascending=False)
     
     def detect_missing_data(self) -> Dict:
         """Analyze missing data patterns"""
-        year_cols = self.get_year_columns()
+        areas = self.df_main['Area'].cat
+        items = self.df_main['Item'].cat
+        
+        if 'Year' in self.df_main.columns:
+            # Normalized format: one value per row
+            years = self.years
+            values = self.df_main['Value'].to_numpy(dtype=np.float64, na_value=np.nan)
+            country_codes = areas.codes.to_numpy()
+            item_codes = items.codes.to_numpy()
+            year_codes = np.searchsorted(years, self.df_main['Year'].to_numpy())
+        else:
+            # Wide format (legacy): one value per row and year column, flattened row by row
+            year_cols = self.year_columns
+            years = [int(col[1:]) for col in year_cols]
+            values = self.df_main[year_cols].to_numpy(dtype=np.float64, na_value=np.nan).ravel()
+            country_codes = np.repeat(areas.codes.to_numpy(), len(year_cols))
+            item_codes = np.repeat(items.codes.to_numpy(), len(year_cols))
+            year_codes = np.tile(np.arange(len(year_cols)), len(self.df_main))
+        
+        by_country, by_item, by_year = _count_missing(
+            values, country_codes, item_codes, year_codes,
+            len(areas.categories), len(items.categories), len(years)
+        )
         
         missing_stats = {
-            'total_cells': len(self.df_main) * len(year_cols),
-            'missing_cells': 0,
-            'missing_by_country': {},
-            'missing_by_item': {},
-            'missing_by_year': {}
+            'total_cells': len(values),
+            'missing_cells': int(by_year.sum()),
+            'missing_by_country': {area: int(count) for area, count in zip(areas.categories, by_country) if count},
+            'missing_by_item': {item: int(count) for item, count in zip(items.categories, by_item) if count},
+            'missing_by_year': {int(year): int(count) for year, count in zip(years, by_year)}
         }
         
-        # Count missing values
-        for col in year_cols:
-            missing_count = self.df_main[col].isna().sum()
-            missing_stats['missing_cells'] += missing_count
-            year = int(col[1:])
-            missing_stats['missing_by_year'][year] = missing_count
-        
         missing_stats['missing_percentage'] = (
             missing_stats['missing_cells'] / missing_stats['total_cells'] * 100
+            if missing_stats['total_cells'] else 0.0
         )
         
         return missing_stats
@@ -260,10 +563,10 @@ class DataProcessor:
         print("Exporting processed data...")
         
         # Export latest year data
-        latest_year = max(self.get_years())
+        latest_year = max(self.years)
         year_col = f'Y{latest_year}'
         
-        latest_data = self.df_main[['Area', 'Item', 'Element', 'Unit', year_col]].copy()
+        latest_data = self.df_main[['Area', 'Item', 'Element', 'Unit', year_col]]
         latest_data.columns = ['Country', 'Item', 'Element', 'Unit', 'Value']
         latest_data.to_csv(output_dir / f'latest_year_{latest_year}.csv', index=False)
         
@@ -273,10 +576,57 @@ class DataProcessor:
         
         print(f"Exported processed data to {output_dir}")
 
+class PolarsDataProcessor(DataProcessor):
+    """DataProcessor whose main query methods run as multi-threaded Polars expressions"""
+    
+    def __init__(self, data_dir: Path):
+        if pl is None:
+            raise ImportError("PolarsDataProcessor requires polars (pip install polars)")
+        super().__init__(data_dir)
+        self.pl_main = None
+    
+    def load_main_data(self) -> pd.DataFrame:
+        """Load the main dataset, then read the Parquet cache into Polars for the overridden queries"""
+        result = super().load_main_data()
+        self.pl_main = pl.read_parquet(self.main_cache)
+        return result
+    
+    @_memoized
+    def get_time_series(self, country: str, item: str, element: str) -> pd.DataFrame:
+        """Get time series data for specific filters"""
+        result = (self.pl_main
+                  .filter((pl.col('Area') == country) & (pl.col('Item') == item)
+                          & (pl.col('Element') == element))
+                  .select(['Year', 'Value', 'Unit'])
+                  .sort('Year'))
+        return result.to_pandas() if result.height else pd.DataFrame()
+    
+    @_memoized
+    def get_top_producers(self, item: str, year: int, n: int = 10) -> pd.DataFrame:
+        """Get top N producers for a specific item and year"""
+        result = (self.pl_main
+                  .filter((pl.col('Item') == item) & (pl.col('Element') == 'Production')
+                          & (pl.col('Year') == year) & (pl.col('Value') > 0))
+                  .select([pl.col('Area').alias('Country'), pl.col('Value').alias('Production'), 'Unit'])
+                  .top_k(n, by='Production')
+                  .sort('Production', descending=True))
+        return result.to_pandas() if result.height else pd.DataFrame()
+    
+    @_memoized
+    def get_production_summary(self, year: int) -> pd.DataFrame:
+        """Get production summary for all items in a specific year"""
+        result = (self.pl_main
+                  .filter((pl.col('Element') == 'Production') & (pl.col('Year') == year))
+                  .group_by(['Item', 'Unit'])
+                  .agg(pl.col('Value').sum().alias('Total_Production'))
+                  .filter(pl.col('Total_Production') > 0)
+                  .sort('Total_Production', descending=True))
+        return result.to_pandas()
+
 def main():
     """Example usage"""
     processor = DataProcessor(Path(__file__).parent)
-    processor.load_all_data()
+    processor.load_main_data()
     
     # Example: Get top rice producers in 2023
     print("\n=== Top 10 Rice Producers in 2023 ===")
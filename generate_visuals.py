@@ -4,19 +4,45 @@ Static Visualizations Generator
 Generate high-quality static charts and save them as images.
 """
 
+import os
 import pandas as pd
 import plotly.graph_objects as go
+import plotly.io as pio
 import plotly.express as px
 from plotly.subplots import make_subplots
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
 from data_processor import DataProcessor
 
+# Export defaults live on pio.defaults from plotly 6.1 (kaleido 1.x), on the kaleido scope before
+IMAGE_DEFAULTS = pio.defaults if hasattr(pio, 'defaults') else pio.kaleido.scope
+IMAGE_DEFAULTS.default_format = 'png'
+IMAGE_DEFAULTS.default_width = 1200
+IMAGE_DEFAULTS.default_height = 600
+
+def _render(fig: go.Figure, save_path) -> None:
+    """Write a figure to an image file"""
+    pio.write_image(fig, save_path)
+    print(f"Saved: {save_path}")
+
+def _render_batch(figures: list, save_paths: list) -> None:
+    """Write several figures with one kaleido browser session; module-level so worker processes can run it"""
+    if hasattr(pio, 'write_images'):
+        # kaleido 1.x starts a browser per call, so the whole batch goes through one call
+        pio.write_images(figures, save_paths)
+        for save_path in save_paths:
+            print(f"Saved: {save_path}")
+    else:
+        # kaleido 0.2 keeps one process-wide scope alive between write_image calls
+        for fig, save_path in zip(figures, save_paths):
+            _render(fig, save_path)
+
 class VisualizationGenerator:
     """Generate static visualizations from agricultural data"""
     
     def __init__(self, data_dir: Path):
         self.processor = DataProcessor(data_dir)
-        self.processor.load_all_data()
+        self.processor.load_main_data()
         self.output_dir = Path(data_dir) / 'visualizations'
         self.output_dir.mkdir(exist_ok=True)
         
@@ -24,9 +50,6 @@ class VisualizationGenerator:
         """Create multi-country production trends"""
         fig = go.Figure()
         
-        year_cols = self.processor.get_year_columns()
-        years = self.processor.get_years()
-        
         for country in countries:
             ts = self.processor.get_time_series(country, item, 'Production')
             if not ts.empty:
@@ -57,8 +80,7 @@ class VisualizationGenerator:
         )
         
         if save_path:
-            fig.write_image(save_path)
-            print(f"Saved: {save_path}")
+            _render(fig, save_path)
         
         return fig
     
@@ -95,8 +117,7 @@ class VisualizationGenerator:
         )
         
         if save_path:
-            fig.write_image(save_path)
-            print(f"Saved: {save_path}")
+            _render(fig, save_path)
         
         return fig
     
@@ -104,36 +125,34 @@ class VisualizationGenerator:
         """Create heatmap of production over time"""
         if countries is None:
             # Get top 15 producers from latest year
-            latest_year = max(self.processor.get_years())
+            latest_year = max(self.processor.years)
             top_df = self.processor.get_top_producers(item, latest_year, 15)
             if not top_df.empty:
                 countries = top_df['Country'].tolist()
             else:
                 return None
         
-        year_cols = self.processor.get_year_columns()
-        years = self.processor.get_years()
-        
-        # Build matrix
-        matrix = []
-        country_labels = []
-        
-        for country in countries:
-            filtered = self.processor.filter_data(country=country, item=item, element='Production')
-            if not filtered.empty:
-                row = filtered.iloc[0]
-                values = [row[col] if not pd.isna(row[col]) else 0 for col in year_cols]
-                matrix.append(values)
-                country_labels.append(country)
-        
-        if not matrix:
+        # Build the country x year matrix in one pass over the item's production rows
+        filtered = self.processor.filter_data_indexed(item=item, element='Production')
+        filtered = filtered[filtered['Area'].isin(countries)]
+        if 'Year' in filtered.columns:
+            matrix = filtered.pivot_table(index='Area', columns='Year', values='Value',
+                                          aggfunc='first', observed=True)
+        else:
+            # Wide format (legacy): year columns are already the matrix
+            matrix = filtered.groupby('Area', observed=True)[self.processor.year_columns].first()
+            matrix.columns = self.processor.years
+        # Keep the requested order, skipping countries without data
+        matrix = matrix.reindex(countries).dropna(how='all').fillna(0)
+        
+        if matrix.empty:
             print(f"No data available for {item}")
             return None
         
         fig = go.Figure(data=go.Heatmap(
-            z=matrix,
-            x=years,
-            y=country_labels,
+            z=matrix.to_numpy(),
+            x=matrix.columns,
+            y=matrix.index,
             colorscale='YlOrRd',
             hoverongaps=False
         ))
@@ -148,8 +167,7 @@ class VisualizationGenerator:
         )
         
         if save_path:
-            fig.write_image(save_path)
-            print(f"Saved: {save_path}")
+            _render(fig, save_path)
         
         return fig
     
@@ -179,26 +197,20 @@ class VisualizationGenerator:
         )
         
         if save_path:
-            fig.write_image(save_path)
-            print(f"Saved: {save_path}")
+            _render(fig, save_path)
         
         return fig
     
     def create_growth_comparison(self, item: str, countries: list, 
                                 start_year: int, end_year: int, save_path: str = None):
         """Create bar chart comparing growth rates"""
-        growth_data = []
-        
-        for country in countries:
-            cagr = self.processor.calculate_growth_rate(country, item, start_year, end_year)
-            if cagr is not None:
-                growth_data.append({'Country': country, 'CAGR': cagr})
+        cagr = self.processor.calculate_growth_rates_bulk(countries, item, start_year, end_year)
         
-        if not growth_data:
+        if cagr.empty:
             print(f"No growth data available")
             return None
         
-        df = pd.DataFrame(growth_data)
+        df = cagr.rename_axis('Country').reset_index(name='CAGR')
         df = df.sort_values('CAGR', ascending=True)
         
         # Color bars based on positive/negative growth
@@ -225,8 +237,7 @@ class VisualizationGenerator:
         )
         
         if save_path:
-            fig.write_image(save_path)
-            print(f"Saved: {save_path}")
+            _render(fig, save_path)
         
         return fig
     
@@ -284,8 +295,8 @@ class VisualizationGenerator:
         )
         
         # 4. Data coverage by year
-        year_cols = self.processor.get_year_columns()
-        years = self.processor.get_years()
+        year_cols = self.processor.year_columns
+        years = self.processor.years
         coverage = []
         for year_col in year_cols:
             non_null = self.processor.df_main[year_col].notna().sum()
@@ -312,8 +323,7 @@ class VisualizationGenerator:
         )
         
         if save_path:
-            fig.write_image(save_path)
-            print(f"Saved: {save_path}")
+            _render(fig, save_path)
         
         return fig
     
@@ -321,60 +331,67 @@ class VisualizationGenerator:
         """Generate a comprehensive set of visualizations"""
         print("Generating visualizations...")
         
-        latest_year = max(self.processor.get_years())
+        latest_year = max(self.processor.years)
+        # Figures are built here and exported together at the end
+        renders = []
         
         # 1. Production trends for major crops
         print("\n1. Creating production trends...")
         major_countries = ['China', 'India', 'Indonesia', 'Bangladesh', 'Viet Nam']
-        self.create_production_trends(
-            major_countries, 
-            'Rice',
+        renders.append((
+            self.create_production_trends(major_countries, 'Rice'),
             self.output_dir / 'rice_production_trends.png'
-        )
+        ))
         
         # 2. Top producers
         print("\n2. Creating top producers charts...")
         for item in ['Rice', 'Wheat', 'Maize (corn)']:
-            self.create_top_producers_bar(
-                item,
-                latest_year,
-                15,
+            renders.append((
+                self.create_top_producers_bar(item, latest_year, 15),
                 self.output_dir / f'{item.lower().replace(" ", "_")}_top_producers.png'
-            )
+            ))
         
         # 3. Production heatmap
         print("\n3. Creating heatmaps...")
-        self.create_production_heatmap(
-            'Rice',
-            save_path=self.output_dir / 'rice_heatmap.png'
-        )
+        renders.append((
+            self.create_production_heatmap('Rice'),
+            self.output_dir / 'rice_heatmap.png'
+        ))
         
         # 4. Country portfolios
         print("\n4. Creating country portfolios...")
         for country in ['China', 'India', 'Indonesia']:
-            self.create_country_portfolio(
-                country,
-                latest_year,
-                20,
+            renders.append((
+                self.create_country_portfolio(country, latest_year, 20),
                 self.output_dir / f'{country.lower()}_portfolio.png'
-            )
+            ))
         
         # 5. Growth comparison
         print("\n5. Creating growth comparisons...")
-        self.create_growth_comparison(
-            'Rice',
-            major_countries,
-            2000,
-            latest_year,
+        renders.append((
+            self.create_growth_comparison('Rice', major_countries, 2000, latest_year),
             self.output_dir / 'rice_growth_comparison.png'
-        )
+        ))
         
         # 6. Dashboard overview
         print("\n6. Creating dashboard overview...")
-        self.create_dashboard_overview(
-            latest_year,
+        renders.append((
+            self.create_dashboard_overview(latest_year),
             self.output_dir / 'dashboard_overview.png'
-        )
+        ))
+        
+        # Image export is the slow part and each figure is independent, so
+        # render them in separate processes (kaleido is not thread-safe).
+        # Each worker gets one batch, so it starts the browser only once
+        print("\nRendering images...")
+        renders = [(fig, path) for fig, path in renders if fig is not None]
+        if renders:
+            workers = min(os.cpu_count() or 1, len(renders))
+            batches = [renders[i::workers] for i in range(workers)]
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                list(executor.map(_render_batch,
+                                  [[fig for fig, _ in batch] for batch in batches],
+                                  [[path for _, path in batch] for batch in batches]))
         
         print(f"\n✓ All visualizations saved to: {self.output_dir}")
 
@@ -8,6 +8,8 @@ import pandas as pd
 import plotly.graph_objects as go
 from pathlib import Path
 
+from data_processor import _wide_row_to_series
+
 print("🧪 Testing Agriculture Dashboard Components\n")
 print("=" * 50)
 
@@ -50,14 +52,8 @@ try:
     if not sample_data.empty:
         row = sample_data.iloc[0]
         
-        # Extract values
-        values = []
-        year_labels = []
-        for year_col in year_cols:
-            val = row[year_col]
-            if not pd.isna(val) and val > 0:
-                values.append(val)
-                year_labels.append(int(year_col[1:]))
+        # Extract the positive values of all year columns in one pass
+        year_labels, values = _wide_row_to_series(row, year_cols, positive=True)
         
         # Create chart
         fig = go.Figure()
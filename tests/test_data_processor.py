@@ -0,0 +1,134 @@
+"""
+DataProcessor Tests
+===================
+Run against a small synthetic dataset written to a temporary directory.
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+import pyarrow.dataset as ds
+import pytest
+
+import data_processor
+from data_processor import DataProcessor
+
+AREAS = [f'Area {i:02d}' for i in range(20)]
+ITEMS = [f'Item {i:02d}' for i in range(6)]
+ELEMENTS = [('Production', 't'), ('Area harvested', 'ha'), ('Yield', 'kg/ha')]
+YEARS = range(1961, 2024)
+
+@pytest.fixture
+def raw_data():
+    """Normalized-format rows whose labels first appear in non-alphabetical order"""
+    rng = np.random.default_rng(0)
+    rows = [(area, item, element, unit, year, float(rng.integers(0, 10**6)))
+            for item in rng.permutation(ITEMS)
+            for area in rng.permutation(AREAS)
+            for element, unit in ELEMENTS
+            for year in YEARS]
+    df = pd.DataFrame(rows, columns=['Area', 'Item', 'Element', 'Unit', 'Year', 'Value'])
+    df.loc[rng.choice(len(df), 200, replace=False), 'Value'] = np.nan
+    return df.sample(frac=1, random_state=0, ignore_index=True)
+
+@pytest.fixture
+def processor(tmp_path, raw_data):
+    """Processor over raw_data with small row groups, so the cache has many of them"""
+    normalized_dir = tmp_path / 'Production_Crops_Livestock_E_All_Data_(Normalized)'
+    normalized_dir.mkdir()
+    raw_data.to_csv(normalized_dir / 'Production_Crops_Livestock_E_All_Data_(Normalized).csv',
+                    index=False, encoding='latin1')
+    processor = DataProcessor(tmp_path)
+    processor.PARQUET_ROW_GROUP_SIZE = 1_000
+    return processor
+
+def test_query_returns_matching_rows(processor, raw_data):
+    result = processor.query(country='Area 07', item='Item 03', element='Production', years=[2000, 2001])
+    expected = raw_data[(raw_data['Area'] == 'Area 07') & (raw_data['Item'] == 'Item 03')
+                        & (raw_data['Element'] == 'Production') & raw_data['Year'].isin([2000, 2001])]
+    assert sorted(result['Year']) == [2000, 2001]
+    pd.testing.assert_series_equal(result.sort_values('Year')['Value'].reset_index(drop=True),
+                                   expected.sort_values('Year')['Value'].reset_index(drop=True),
+                                   check_dtype=False)
+
+@pytest.mark.parametrize('item', ITEMS)
+def test_query_item_filter_prunes_row_groups(processor, raw_data, item):
+    processor.query(item=item)  # builds the cache
+    fragment = next(ds.dataset(processor.main_cache, format='parquet').get_fragments())
+    matched = fragment.split_by_row_group(ds.field('Item') == item)
+    rows = int((raw_data['Item'] == item).sum())
+    assert fragment.num_row_groups > 10
+    assert len(matched) <= math.ceil(rows / processor.PARQUET_ROW_GROUP_SIZE) + 1
+
+def test_old_cache_layout_is_rebuilt(processor):
+    processor.query(item='Item 00')
+    # An unversioned cache newer than the CSV, as written before the layout key existed
+    pd.read_parquet(processor.main_cache).to_parquet(processor.main_cache)
+    assert not processor._cache_is_current(processor.main_csv, processor.main_cache)
+    processor.query(item='Item 00')
+    assert processor._cache_is_current(processor.main_csv, processor.main_cache)
+
+def test_query_cache_is_per_instance_and_copied(processor, tmp_path):
+    processor.load_main_data()
+    other = DataProcessor(tmp_path)
+    other.load_main_data()
+    first = processor.get_top_producers('Item 01', 2000, 5)
+    first['Production'] = 0.0
+    assert (processor.get_top_producers('Item 01', 2000, 5)['Production'] > 0).all()
+    other.get_top_producers('Item 02', 2000, 5)
+    # Reloading one processor leaves the other's cached results alone
+    processor.load_main_data()
+    assert not processor._query_cache and other._query_cache
+
+def test_numba_production_summary_matches_pandas(processor, monkeypatch):
+    pytest.importorskip('numba')
+    processor.load_main_data()
+    numba_summary = processor.get_production_summary(2000)
+    monkeypatch.setattr(data_processor, 'njit', None)
+    processor.load_main_data()
+    # The engines list the label categories in different orders, which unordered categoricals ignore
+    pd.testing.assert_frame_equal(numba_summary.reset_index(drop=True),
+                                  processor.get_production_summary(2000).reset_index(drop=True),
+                                  check_categorical=False)
+
+def test_numba_missing_counts_match_numpy(raw_data):
+    pytest.importorskip('numba')
+    rng = np.random.default_rng(1)
+    areas = pd.Categorical(raw_data['Area'].mask(rng.random(len(raw_data)) < 0.01))
+    items = pd.Categorical(raw_data['Item'])
+    args = (raw_data['Value'].to_numpy(), areas.codes.astype(np.int64), items.codes.astype(np.int64),
+            (raw_data['Year'] - YEARS.start).to_numpy(),
+            len(areas.categories), len(items.categories), len(YEARS))
+    for numba_counts, numpy_counts in zip(data_processor._count_missing(*args),
+                                          data_processor._count_missing_numpy(*args)):
+        np.testing.assert_array_equal(numba_counts, numpy_counts)
+
+@pytest.mark.parametrize('method, args', [
+    ('get_time_series', ('Area 07', 'Item 03', 'Yield')),
+    ('get_top_producers', ('Item 02', 1990, 5)),
+    ('get_production_summary', (2010,)),
+])
+def test_polars_queries_match_pandas(processor, tmp_path, method, args):
+    pytest.importorskip('polars')
+    processor.load_main_data()
+    polars_processor = data_processor.PolarsDataProcessor(tmp_path)
+    polars_processor.load_main_data()
+    # Polars hands the labels back as plain strings rather than categoricals
+    pd.testing.assert_frame_equal(getattr(polars_processor, method)(*args).reset_index(drop=True),
+                                  getattr(processor, method)(*args).reset_index(drop=True),
+                                  check_dtype=False, check_categorical=False)
+
+@pytest.mark.parametrize('filters', [
+    {'country': 'Area 07', 'item': 'Item 03'},
+    {'item': 'Item 01', 'element': 'Yield'},
+    {'country': 'Area 12', 'item': 'Item 05', 'element': 'Production'},
+])
+def test_numexpr_filter_matches_numpy(processor, monkeypatch, filters):
+    pytest.importorskip('numexpr')
+    processor.load_main_data()
+    numexpr_rows = processor.filter_data(**filters)
+    monkeypatch.setattr(data_processor, 'ne', None)
+    numpy_rows = processor.filter_data(**filters)
+    assert len(numexpr_rows) > 0
+    pd.testing.assert_frame_equal(numexpr_rows, numpy_rows)